@@ -1,27 +1,188 @@
 import streamlit as st
 from pathlib import Path
-import time
 from src.assistant.code_assistant import CodeAssistant
 from src.utils.logger import logger
+from src.utils.exceptions import FileOperationError
+
+PAGE_SIZE = 50
 
 def refresh_project(assistant, project_path):
     """Refresh project files by reloading the project"""
     if project_path:
         try:
-            return assistant.load_project(project_path)
+            result = assistant.load_project(project_path)
+            # File list changed, rebuild the browser index on next access
+            st.session_state.file_index = None
+            current_file = st.session_state.current_file
+            if current_file:
+                st.session_state.pop(editor_key(current_file), None)
+                if current_file in assistant.file_handler.project_files:
+                    st.session_state.file_content = assistant.file_handler.project_files[current_file]
+                else:
+                    st.session_state.current_file = None
+                    st.session_state.file_content = None
+            return result
         except Exception as e:
             st.error(f"Error refreshing project: {str(e)}")
             return None
 
-def show_file_editor(file_content, file_path):
-    """Show editor for file content with syntax highlighting"""
-    file_extension = Path(file_path).suffix[1:]
-    return st.text_area(
-        "Edit File Content",
-        value=file_content,
-        height=400,
-        key=f"editor_{file_path}_{int(time.time())}"
-    )
+def get_file_index(assistant):
+    """Build (once per load) a directory -> (subdirs, files) map of relative paths"""
+    if st.session_state.get('file_index') is None:
+        root = assistant.file_handler.current_project
+        tree = {"": (set(), [])}
+        paths = sorted(
+            Path(f).relative_to(root).as_posix()
+            for f in assistant.file_handler.project_files
+        )
+        for rel_path in paths:
+            parent = ""
+            parts = rel_path.split("/")
+            for part in parts[:-1]:
+                child = f"{parent}/{part}" if parent else part
+                tree[parent][0].add(child)
+                tree.setdefault(child, (set(), []))
+                parent = child
+            tree[parent][1].append(rel_path)
+        st.session_state.file_index = {
+            'paths': paths,
+            # Lowercased once here so filtering doesn't allocate per keystroke
+            'search_paths': [p.lower() for p in paths],
+            'tree': {d: (sorted(dirs), files) for d, (dirs, files) in tree.items()}
+        }
+    return st.session_state.file_index
+
+def editor_key(file_path):
+    return f"editor_{file_path}"
+
+def open_file(assistant, file_path):
+    """Load a file's content into the editor only when it is opened"""
+    try:
+        content = assistant.file_handler.project_files[file_path]
+    except FileOperationError as e:
+        # Contents were trimmed and the file is gone from disk; forget it
+        del assistant.file_handler.project_files[file_path]
+        st.session_state.file_index = None
+        logger.warning(str(e))
+        return False
+    if st.session_state.current_file:
+        st.session_state.pop(editor_key(st.session_state.current_file), None)
+    st.session_state.current_file = file_path
+    st.session_state.file_content = content
+    return True
+
+def set_page(state_key, page):
+    st.session_state[state_key] = page
+
+def browse_to(directory):
+    st.session_state.browse_dir = directory
+    st.session_state.browser_page = 0
+
+def paginate(items, state_key):
+    """Render pager controls and return the current page of items"""
+    page_count = max(1, -(-len(items) // PAGE_SIZE))
+    page = min(st.session_state.get(state_key, 0), page_count - 1)
+    st.session_state[state_key] = page
+    if page_count > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀", key=f"{state_key}_prev", disabled=page == 0,
+                      on_click=set_page, args=(state_key, page - 1))
+        with col3:
+            st.button("▶", key=f"{state_key}_next", disabled=page == page_count - 1,
+                      on_click=set_page, args=(state_key, page + 1))
+        with col2:
+            st.caption(f"Page {page + 1} of {page_count} ({len(items)} items)")
+    return items[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+@st.fragment
+def show_file_browser(assistant):
+    """Directory tree browser with search; reruns on its own"""
+    index = get_file_index(assistant)
+    root = assistant.file_handler.current_project
+    query = st.text_input(
+        "Filter files", key="file_filter", on_change=set_page, args=("browser_page", 0)
+    ).strip().lower()
+
+    if query:
+        matches = [
+            path for path, search_path in zip(index['paths'], index['search_paths'])
+            if query in search_path
+        ]
+        entries = [("file", p) for p in matches]
+    else:
+        current_dir = st.session_state.get('browse_dir', "")
+        if current_dir not in index['tree']:
+            current_dir = ""
+        st.caption(f"📁 /{current_dir}")
+        if current_dir:
+            st.button("⬆ ..", key="browse_up", use_container_width=True,
+                      on_click=browse_to, args=(current_dir.rpartition("/")[0],))
+        dirs, files = index['tree'][current_dir]
+        entries = [("dir", d) for d in dirs] + [("file", f) for f in files]
+
+    for kind, rel_path in paginate(entries, "browser_page"):
+        if kind == "dir":
+            st.button(f"📁 {rel_path.rpartition('/')[2]}", key=f"dir_{rel_path}",
+                      use_container_width=True, on_click=browse_to, args=(rel_path,))
+        else:
+            label = rel_path if query else rel_path.rpartition('/')[2]
+            if st.button(f"📄 {label}", key=f"file_{rel_path}", use_container_width=True):
+                if open_file(assistant, str(root / rel_path)):
+                    # The editor lives outside this fragment, so rerun the whole app
+                    st.rerun()
+                st.warning(f"{rel_path} no longer exists")
+
+@st.fragment
+def show_file_editor(assistant):
+    """Show editor for the open file; edits and saves rerun only this fragment"""
+    file_path = st.session_state.current_file
+    if not file_path:
+        st.info("Select a file from the sidebar to edit")
+        return
+
+    st.caption(file_path)
+    key = editor_key(file_path)
+    if key not in st.session_state:
+        st.session_state[key] = st.session_state.file_content
+    edited_content = st.text_area("Edit File Content", height=400, key=key)
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        if st.button("Save Changes", use_container_width=True):
+            try:
+                with st.spinner("Saving changes..."):
+                    # Create backup before saving
+                    assistant.file_handler.backup_file(file_path)
+                    # Save changes
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(edited_content)
+                    # Update in-memory content
+                    assistant.file_handler.project_files[file_path] = edited_content
+                    assistant.file_handler.track_changes('edit', file_path, edited_content)
+                    st.session_state.file_content = edited_content
+                    st.success("Changes saved successfully!")
+            except Exception as e:
+                st.error(f"Error saving file: {str(e)}")
+
+    with col2:
+        if st.button("Restore Backup", use_container_width=True):
+            try:
+                if assistant.file_handler.restore_backup(file_path):
+                    st.success("File restored from backup")
+                    # Refresh content after restore
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        restored_content = f.read()
+                    assistant.file_handler.project_files[file_path] = restored_content
+                    assistant.file_handler.track_changes('restore', file_path, restored_content)
+                    st.session_state.file_content = restored_content
+                    # Drop the widget state so the editor picks up the restored text
+                    del st.session_state[key]
+                    st.rerun(scope="fragment")
+                else:
+                    st.warning("No backup found")
+            except Exception as e:
+                st.error(f"Error restoring backup: {str(e)}")
 
 def create_enhanced_ui():
     st.set_page_config(
@@ -53,10 +214,13 @@ def create_enhanced_ui():
     
     # Initialize session state
     if 'assistant' not in st.session_state:
+        # Streamlit has no session-end hook; the governor only holds weak references,
+        # so a closed session's model is freed once its state is collected
         st.session_state.assistant = CodeAssistant()
         st.session_state.current_file = None
         st.session_state.file_content = None
         st.session_state.project_path = None
+        st.session_state.file_index = None
     
     st.title("🤖 AI Code Assistant")
     
@@ -90,15 +254,7 @@ def create_enhanced_ui():
         # File browser
         if st.session_state.assistant.file_handler.project_files:
             st.subheader("Project Files")
-            files = list(st.session_state.assistant.file_handler.project_files.keys())
-            selected_file = st.selectbox(
-                "Select a file to edit",
-                files,
-                format_func=lambda x: Path(x).name
-            )
-            if selected_file:
-                st.session_state.current_file = selected_file
-                st.session_state.file_content = st.session_state.assistant.file_handler.project_files[selected_file]
+            show_file_browser(st.session_state.assistant)
     
     # Main content
     tabs = st.tabs(["File Editor", "Generate Code", "Modify File", "Create File"])
@@ -106,45 +262,7 @@ def create_enhanced_ui():
 
     # File Editor Tab
     with tabs[0]:
-        if st.session_state.current_file and st.session_state.file_content:
-            edited_content = show_file_editor(
-                st.session_state.file_content,
-                st.session_state.current_file
-            )
-            col1, col2 = st.columns([1, 1])
-            with col1:
-                if st.button("Save Changes", use_container_width=True):
-                    try:
-                        with st.spinner("Saving changes..."):
-                            # Create backup before saving
-                            st.session_state.assistant.file_handler.backup_file(st.session_state.current_file)
-                            # Save changes
-                            with open(st.session_state.current_file, 'w', encoding='utf-8') as f:
-                                f.write(edited_content)
-                            # Update in-memory content
-                            st.session_state.assistant.file_handler.project_files[st.session_state.current_file] = edited_content
-                            st.session_state.file_content = edited_content
-                            st.success("Changes saved successfully!")
-                    except Exception as e:
-                        st.error(f"Error saving file: {str(e)}")
-            
-            with col2:
-                if st.button("Restore Backup", use_container_width=True):
-                    try:
-                        if st.session_state.assistant.file_handler.restore_backup(st.session_state.current_file):
-                            st.success("File restored from backup")
-                            # Refresh content after restore
-                            with open(st.session_state.current_file, 'r', encoding='utf-8') as f:
-                                restored_content = f.read()
-                            st.session_state.file_content = restored_content
-                            st.session_state.assistant.file_handler.project_files[st.session_state.current_file] = restored_content
-                            st.experimental_rerun()
-                        else:
-                            st.warning("No backup found")
-                    except Exception as e:
-                        st.error(f"Error restoring backup: {str(e)}")
-        else:
-            st.info("Select a file from the sidebar to edit")
+        show_file_editor(st.session_state.assistant)
 
     
     # Generate Code Tab
@@ -9,6 +9,7 @@ setup(
         "torch>=2.1.0",
         "pathspec>=0.11.0",
         "sympy>=1.12",
+        "psutil>=5.9.0",
     ],
     author="Bamba Ba",
     author_email="lebabamth@gmail.com",
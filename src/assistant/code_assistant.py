@@ -4,11 +4,36 @@ from ..utils.logger import logger
 from ..utils.file_handler import ProjectFileHandler
 from ..utils.exceptions import CodeAssistantError
 from .model_handler import ModelHandler
+from .resource_governor import get_governor
 
 class CodeAssistant:
     def __init__(self, model_name=None):
         self.model_handler = ModelHandler()
         self.file_handler = ProjectFileHandler()
+        self.governor = self.register_with_governor()
+
+    def register_with_governor(self):
+        """Hand the model and caches to the process-wide resource governor"""
+        config = self.file_handler.config
+        governor = get_governor(
+            idle_timeout=config.get('model_idle_timeout', 1800),
+            memory_threshold=config.get('memory_threshold', 85),
+            critical_memory_threshold=config.get('critical_memory_threshold', 95),
+            check_interval=config.get('governor_interval', 30),
+            trim_cooldown=config.get('trim_cooldown', 300)
+        )
+        governor.register_model(self.model_handler)
+        governor.register_cache('model', self.model_handler.trim_caches)
+        governor.register_cache('project files', self.file_handler.trim_caches)
+        governor.register_task('journal flush', self.file_handler.flush_journal)
+        return governor
+
+    def close(self):
+        """Detach from the governor and release the model"""
+        self.governor.unregister(self.model_handler)
+        self.governor.unregister(self.file_handler)
+        self.file_handler.close_journal()
+        self.model_handler.unload()
 
     def load_project(self, project_path):
         return self.file_handler.load_project(project_path)
@@ -43,7 +68,7 @@ class CodeAssistant:
                 f.write(modified_content)
             
             self.file_handler.project_files[full_path] = modified_content
-            self.file_handler.track_changes('modify', full_path)
+            self.file_handler.track_changes('modify', full_path, modified_content)
             
             return f"Successfully modified {file_path}"
         except Exception as e:
@@ -78,7 +103,7 @@ class CodeAssistant:
                 f.write(new_content)
             
             self.file_handler.project_files[full_path] = new_content
-            self.file_handler.track_changes('create', full_path)
+            self.file_handler.track_changes('create', full_path, new_content)
             
             return f"Successfully created {file_path}"
         except Exception as e:
@@ -2,35 +2,110 @@ import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from ..utils.logger import logger
 from ..utils.exceptions import CodeAssistantError
+import gc
+import threading
 import time
 
 class ModelHandler:
     def __init__(self, model_name="deepseek-ai/deepseek-coder-1.3b-instruct"):
         logger.info(f"Initializing model handler with model: {model_name}")
-        
+        self.model_name = model_name
+        self.model = None
+        self.tokenizer = None
+        self.last_used = time.time()
+        self.evicted = False
+        # Guards load/unload against a generation running on another thread
+        self._lock = threading.RLock()
+        self.load()
+
+    @property
+    def is_loaded(self):
+        return self.model is not None
+
+    def load(self):
+        """Load tokenizer and weights, returning the time it took in seconds"""
+        with self._lock:
+            if self.is_loaded:
+                return 0.0
+
+            start = time.perf_counter()
+            try:
+                device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    torch_dtype=torch.float16,  # Use float16 for better memory efficiency
+                    device_map={"": device},
+                    trust_remote_code=True
+                )
+                logger.info(f"Model loaded on device: {device}")
+            except Exception as e:
+                logger.error(f"Failed to initialize model with GPU, falling back to CPU: {str(e)}")
+                # Fallback to CPU if GPU initialization fails
+                if self.tokenizer is None:
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    torch_dtype=torch.float32,
+                    device_map="cpu",
+                    trust_remote_code=True
+                )
+            elapsed = time.perf_counter() - start
+
+            if self.evicted:
+                logger.info(f"Reloaded model {self.model_name} after eviction in {elapsed:.2f}s")
+                self.evicted = False
+            self.last_used = time.time()
+            return elapsed
+
+    def unload(self, blocking=True, idle_for=None):
+        """Release the model weights, returning the time it took in seconds.
+
+        Returns None instead if ``blocking`` is False and a generation is in
+        progress, or if the model was used within the last ``idle_for`` seconds.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return None
         try:
-            device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                torch_dtype=torch.float16,  # Use float16 for better memory efficiency
-                device_map={"": device},
-                trust_remote_code=True
-            )
-            logger.info(f"Model loaded on device: {device}")
-        except Exception as e:
-            logger.error(f"Failed to initialize model with GPU, falling back to CPU: {str(e)}")
-            # Fallback to CPU if GPU initialization fails
-            self.model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                torch_dtype=torch.float32,
-                device_map="cpu",
-                trust_remote_code=True
-            )
+            if not self.is_loaded:
+                return 0.0
+            # Re-check under the lock: a generation may have finished since the caller looked
+            if idle_for is not None and self.idle_seconds() < idle_for:
+                return None
 
+            start = time.perf_counter()
+            self.model = None
+            self.tokenizer = None
+            gc.collect()
+            self.trim_caches()
+            elapsed = time.perf_counter() - start
 
+            self.evicted = True
+            return elapsed
+        finally:
+            self._lock.release()
+
+    def trim_caches(self):
+        """Return cached allocator blocks (KV cache leftovers, activations) to the OS"""
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+
+    def idle_seconds(self):
+        return time.time() - self.last_used
 
     def generate(self, prompt, max_new_tokens=4096, temperature=0.7):
+        with self._lock:
+            self.last_used = time.time()
+            try:
+                # Transparently bring the model back if the governor evicted it
+                self.load()
+                return self._generate(prompt, max_new_tokens, temperature)
+            finally:
+                self.last_used = time.time()
+
+    def _generate(self, prompt, max_new_tokens, temperature):
         try:
             logger.info("Starting code generation...")
             logger.info("Tokenizing input...")
@@ -0,0 +1,186 @@
+import ctypes
+import gc
+import threading
+import time
+import weakref
+import psutil
+from ..utils.logger import logger
+
+try:
+    _libc = ctypes.CDLL("libc.so.6")
+except OSError:
+    _libc = None
+
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_governor(**settings):
+    """Return the process-wide governor, creating it with ``settings`` on first use"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = ResourceGovernor(**settings)
+        return _governor
+
+class ResourceGovernor:
+    """Unloads idle models and trims caches when the host runs low on memory"""
+
+    def __init__(self, idle_timeout=1800, memory_threshold=85, critical_memory_threshold=95,
+                 check_interval=30, trim_cooldown=300):
+        self.idle_timeout = idle_timeout
+        self.memory_threshold = memory_threshold
+        self.critical_memory_threshold = critical_memory_threshold
+        self.check_interval = check_interval
+        self.trim_cooldown = trim_cooldown
+        # Weak references only, so a discarded session's model can still be collected
+        self.model_handlers = weakref.WeakSet()
+        self.cache_trimmers = []
+        self.periodic_tasks = []
+        self._trim_backoff = trim_cooldown
+        self._next_trim = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def register_model(self, model_handler):
+        """Watch a model handler for idleness"""
+        self.model_handlers.add(model_handler)
+        self.start()
+
+    def register_cache(self, name, trim_func):
+        """Register a bound method that releases memory held by a cache"""
+        with self._lock:
+            self.cache_trimmers.append((name, weakref.WeakMethod(trim_func)))
+        self.start()
+
+    def register_task(self, name, func):
+        """Register a bound method to run on every governor pass"""
+        with self._lock:
+            self.periodic_tasks.append((name, weakref.WeakMethod(func)))
+        self.start()
+
+    def unregister(self, owner):
+        """Forget a model handler and every callback bound to ``owner``"""
+        self.model_handlers.discard(owner)
+        with self._lock:
+            self.cache_trimmers = self._without(self.cache_trimmers, owner)
+            self.periodic_tasks = self._without(self.periodic_tasks, owner)
+
+    @staticmethod
+    def _without(callbacks, owner):
+        kept = []
+        for name, ref in callbacks:
+            func = ref()
+            if func is not None and func.__self__ is not owner:
+                kept.append((name, ref))
+        return kept
+
+    def _callbacks(self, attr):
+        with self._lock:
+            callbacks = [(name, ref()) for name, ref in getattr(self, attr)]
+        return [(name, func) for name, func in callbacks if func is not None]
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="resource-governor", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Resource governor started (idle timeout {self.idle_timeout}s, "
+            f"memory threshold {self.memory_threshold}%)"
+        )
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.check_interval)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Resource governor check failed: {str(e)}")
+
+    def check(self):
+        """Run one governor pass; safe to call directly"""
+        for name, func in self._callbacks('periodic_tasks'):
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Periodic task {name} failed: {str(e)}")
+
+        for handler in list(self.model_handlers):
+            if self.idle_timeout and handler.is_loaded \
+                    and handler.idle_seconds() >= self.idle_timeout:
+                self.evict_model(handler, self.idle_timeout,
+                                 reason=f"idle for {handler.idle_seconds():.0f}s")
+
+        memory_percent = psutil.virtual_memory().percent
+        if memory_percent < self.memory_threshold:
+            self._trim_backoff = self.trim_cooldown
+            self._next_trim = 0.0
+            return
+        if time.time() < self._next_trim:
+            return
+
+        freed = self.trim_caches(reason=f"memory usage at {memory_percent}%")
+        # Back off while trimming frees nothing, e.g. when another process holds the memory
+        if freed >= 1:
+            self._trim_backoff = self.trim_cooldown
+        else:
+            self._trim_backoff = min(self._trim_backoff * 2, 12 * self.trim_cooldown)
+        self._next_trim = time.time() + self._trim_backoff
+
+        memory_percent = psutil.virtual_memory().percent
+        if memory_percent >= self.critical_memory_threshold:
+            for handler in list(self.model_handlers):
+                # Leave recently used models alone so a fresh reload isn't undone at once
+                if handler.is_loaded and handler.idle_seconds() >= self.trim_cooldown:
+                    self.evict_model(
+                        handler, self.trim_cooldown,
+                        reason=f"memory usage still at {memory_percent}% after trimming"
+                    )
+
+    def evict_model(self, model_handler, idle_for, reason):
+        rss_before = self._rss_mb()
+        # Don't block behind a running generation; try again on the next pass
+        elapsed = model_handler.unload(blocking=False, idle_for=idle_for)
+        if elapsed is None:
+            logger.info("Model busy or recently used, postponing eviction")
+            return
+        logger.info(
+            f"Evicted model {model_handler.model_name} ({reason}) in {elapsed:.2f}s, "
+            f"freed {rss_before - self._rss_mb():.0f} MB RSS"
+        )
+
+    def trim_caches(self, reason):
+        """Run every registered trimmer and return the MB of RSS freed"""
+        start = time.perf_counter()
+        rss_before = self._rss_mb()
+        trimmers = self._callbacks('cache_trimmers')
+        for name, trim_func in trimmers:
+            try:
+                trim_func()
+            except Exception as e:
+                logger.warning(f"Failed to trim {name} cache: {str(e)}")
+        gc.collect()
+        if _libc is not None:
+            # Hand freed heap pages back to the OS; gc alone leaves them in the allocator
+            _libc.malloc_trim(0)
+        elapsed = time.perf_counter() - start
+        freed = rss_before - self._rss_mb()
+        if freed >= 1:
+            logger.info(
+                f"Trimmed caches {[name for name, _ in trimmers]} ({reason}) "
+                f"in {elapsed:.2f}s, freed {freed:.0f} MB RSS"
+            )
+        return freed
+
+    @staticmethod
+    def _rss_mb():
+        return psutil.Process().memory_info().rss / 1e6
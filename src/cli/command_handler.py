@@ -62,3 +62,5 @@ def handle_commands():
         except Exception as e:
             logger.error(f"Error: {str(e)}")
             print(f"Error: {str(e)}")
+
+    assistant.close()
@@ -0,0 +1,197 @@
+import bisect
+import json
+import threading
+import time
+import weakref
+from array import array
+from collections import deque
+from pathlib import Path
+from .logger import logger
+from .exceptions import FileOperationError
+
+_journals = weakref.WeakValueDictionary()
+_journals_lock = threading.Lock()
+
+def get_journal(journal_path, **settings):
+    """Return the process-wide journal for ``journal_path``, creating it with ``settings`` on first use"""
+    journal_path = Path(journal_path).resolve()
+    with _journals_lock:
+        journal = _journals.get(journal_path)
+        if journal is None:
+            journal = ChangeJournal(journal_path, **settings)
+            _journals[journal_path] = journal
+        return journal
+
+def _write_entries(journal_path, entries):
+    """Append entries to the journal file, returning their byte offsets"""
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    offsets = []
+    with open(journal_path, 'ab') as f:
+        for entry in entries:
+            offsets.append(f.tell())
+            f.write(json.dumps(entry).encode('utf-8') + b'\n')
+    return offsets
+
+def _flush_pending(journal_path, pending):
+    # Runs when a journal is collected or at exit; it must not reference the journal itself
+    if not pending:
+        return
+    try:
+        _write_entries(journal_path, pending)
+    except OSError as e:
+        logger.warning(f"Lost {len(pending)} change journal entries: {str(e)}")
+
+class ChangeJournal:
+    """Append-only JSON-lines journal with a bounded in-memory window of recent changes"""
+
+    def __init__(self, journal_path, window_size=1000, batch_size=20, flush_interval=30.0):
+        self.journal_path = Path(journal_path)
+        self.window = deque()
+        self.window_size = window_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.time()
+        self._lock = threading.RLock()
+
+        # Index over every entry, in append order. It grows by design, but as
+        # packed arrays (~8 bytes per field) rather than entries or int objects
+        self._count = 0
+        self._offsets = array('q')
+        self._timestamps = array('d')
+        self._by_file = {}
+        self._by_type = {}
+
+        self._load_index()
+        # Write whatever is still pending when the journal is collected or the process exits
+        weakref.finalize(self, _flush_pending, self.journal_path, self._pending)
+
+    def _load_index(self):
+        """Index an existing journal, keeping its tail in the window"""
+        if not self.journal_path.exists():
+            return
+        tail = deque(maxlen=self.window_size)
+        try:
+            with open(self.journal_path, 'r+b') as f:
+                offset = f.tell()
+                for line in iter(f.readline, b''):
+                    if not line.endswith(b'\n'):
+                        # Partial write from a crash; drop it so appends stay line-aligned
+                        logger.warning(f"Truncating incomplete journal entry at offset {offset}")
+                        f.truncate(offset)
+                        break
+                    try:
+                        entry = json.loads(line)
+                        self._index(entry)
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Skipping corrupt journal line at offset {offset}")
+                    else:
+                        self._offsets.append(offset)
+                        tail.append(entry)
+                    offset = f.tell()
+            self.window.extend(tail)
+            logger.info(f"Loaded change journal with {self._count} entries from {self.journal_path}")
+        except OSError as e:
+            raise FileOperationError(f"Failed to read change journal: {str(e)}")
+
+    def _index(self, entry):
+        # Validate every field before touching the index so a bad entry leaves it intact
+        timestamp = float(entry['timestamp'])
+        file, change_type = entry['file'], entry['type']
+        if not isinstance(file, str) or not isinstance(change_type, str):
+            raise TypeError("journal entry 'file' and 'type' must be strings")
+
+        position = self._count
+        self._count += 1
+        self._timestamps.append(timestamp)
+        self._by_file.setdefault(file, array('q')).append(position)
+        self._by_type.setdefault(change_type, array('q')).append(position)
+
+    def append(self, entry):
+        """Record a change; it is written to disk with the next batch"""
+        with self._lock:
+            self._index(entry)
+            self.window.append(entry)
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            self._trim_window(self.window_size)
+
+    def _trim_window(self, size):
+        # Entries that haven't reached disk stay in memory until a flush succeeds
+        flushed = len(self._offsets)
+        while len(self.window) > size and self._count - len(self.window) < flushed:
+            self.window.popleft()
+
+    def flush_due(self):
+        """Flush if entries have been pending for ``flush_interval`` seconds"""
+        if self._pending and time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries to disk; on failure they are kept and retried"""
+        with self._lock:
+            self._last_flush = time.time()
+            if not self._pending:
+                return
+            try:
+                self._offsets.extend(_write_entries(self.journal_path, self._pending))
+                # Cleared in place; the finalizer holds this same list
+                self._pending.clear()
+            except OSError as e:
+                logger.warning(
+                    f"Failed to write change journal, {len(self._pending)} entries pending: {str(e)}"
+                )
+
+    def trim(self):
+        """Drop the in-memory window; queries fall back to the on-disk journal"""
+        with self._lock:
+            self.flush()
+            self._trim_window(0)
+
+
+    def query(self, file=None, change_type=None, since=None, until=None, limit=None):
+        """Return matching changes, newest first"""
+        with self._lock:
+            # Timestamps are append-ordered, so the time range is a slice
+            start = bisect.bisect_left(self._timestamps, since) if since is not None else 0
+            end = bisect.bisect_right(self._timestamps, until) if until is not None else self._count
+
+            candidates = None
+            for index, key in ((self._by_file, file), (self._by_type, change_type)):
+                if key is not None:
+                    positions = index.get(key, [])
+                    candidates = positions if candidates is None \
+                        else sorted(set(candidates).intersection(positions))
+            if candidates is None:
+                candidates = range(start, end)
+            else:
+                candidates = candidates[bisect.bisect_left(candidates, start):
+                                        bisect.bisect_left(candidates, end)]
+
+            results = []
+            window_start = self._count - len(self.window)
+            journal_file = None
+            try:
+                for position in reversed(candidates):
+                    if limit is not None and len(results) >= limit:
+                        break
+                    if position >= window_start:
+                        results.append(self.window[position - window_start])
+                        continue
+                    if journal_file is None:
+                        journal_file = open(self.journal_path, 'rb')
+                    journal_file.seek(self._offsets[position])
+                    results.append(json.loads(journal_file.readline()))
+            finally:
+                if journal_file is not None:
+                    journal_file.close()
+            return results
+
+    def last_change(self, file):
+        """Most recent change to ``file``, or None"""
+        changes = self.query(file=file, limit=1)
+        return changes[0] if changes else None
+
+    def __len__(self):
+        return self._count
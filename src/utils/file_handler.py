@@ -2,20 +2,59 @@ import os
 import time
 import shutil
 import yaml
+from collections.abc import MutableMapping
 from pathlib import Path
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
 from .logger import logger
+from .change_journal import get_journal
 from .exceptions import ProjectLoadError, FileOperationError
 
+class ProjectFiles(MutableMapping):
+    """Maps file paths to contents; evicted contents are re-read from disk on access"""
+
+    def __init__(self):
+        # None marks content that was evicted and must be reloaded
+        self._contents = {}
+
+    def __getitem__(self, file_path):
+        content = self._contents[file_path]
+        if content is None:
+            try:
+                content = Path(file_path).read_text(encoding='utf-8')
+            except Exception as e:
+                raise FileOperationError(f"Could not reload {file_path}: {str(e)}")
+            self._contents[file_path] = content
+        return content
+
+    def __setitem__(self, file_path, content):
+        self._contents[file_path] = content
+
+    def __delitem__(self, file_path):
+        del self._contents[file_path]
+
+    def __contains__(self, file_path):
+        return file_path in self._contents
+
+    def __iter__(self):
+        return iter(self._contents)
+
+    def __len__(self):
+        return len(self._contents)
+
+    def evict(self):
+        """Drop cached contents, keeping the file index"""
+        for file_path in list(self._contents):
+            self._contents[file_path] = None
+
 class ProjectFileHandler:
     def __init__(self):
         self.current_project = None
-        self.project_files = {}
+        self.project_files = ProjectFiles()
         self.gitignore_spec = None
         self.project_metadata = {}
         self.config = self.load_config()
-        self.changes = []
+        self.journal = None
         
     def load_gitignore(self, project_path):
         """Load and parse .gitignore file if it exists."""
@@ -44,7 +83,16 @@ class ProjectFileHandler:
             'backup_enabled': True,
             'max_file_size': 10_000_000,  # 10MB
             'excluded_binary': ['.pyc', '.exe', '.dll', '.so', '.dylib'],
-            'backup_count': 5
+            'backup_count': 5,
+            'model_idle_timeout': 1800,  # seconds before an idle model is unloaded, 0 disables
+            'memory_threshold': 85,  # % system memory at which caches are trimmed
+            'critical_memory_threshold': 95,  # % at which the model is evicted
+            'governor_interval': 30,
+            'trim_cooldown': 300,  # min seconds between trims, doubled while nothing is freed
+            'journal_window': 1000,  # recent changes kept in memory
+            'journal_batch_size': 20,
+            # Checked on each governor pass, so flushes are at least governor_interval apart
+            'journal_flush_interval': 30
         }
         
         if config_path.exists():
@@ -87,12 +135,13 @@ class ProjectFileHandler:
         except Exception as e:
             raise FileOperationError(f"Restore failed: {str(e)}")
 
-    def analyze_code(self, file_path):
-        """Analyze code for quality and metrics"""
+    def analyze_code(self, file_path, content=None):
+        """Analyze code for quality and metrics, reading the file only if content is not given"""
         try:
             extension = Path(file_path).suffix
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
                 
             analysis = {
                 'lines': len(content.splitlines()),
@@ -106,15 +155,54 @@ class ProjectFileHandler:
             logger.error(f"Analysis failed for {file_path}: {e}")
             return None
 
-    def track_changes(self, change_type, file_path):
-        """Track project changes"""
+    def track_changes(self, change_type, file_path, content=None):
+        """Record a change in the project journal"""
+        if self.journal is None:
+            return
         change = {
             'timestamp': time.time(),
             'type': change_type,
-            'file': file_path,
-            'analysis': self.analyze_code(file_path)
+            'file': str(file_path),
+            'analysis': self.analyze_code(file_path, content)
         }
-        self.changes.append(change)
+        # Journaling must never fail the change it records
+        try:
+            self.journal.append(change)
+        except Exception as e:
+            logger.warning(f"Failed to journal {change_type} of {file_path}: {e}")
+
+    def open_journal(self):
+        """Open the change journal of the current project, reusing it on reload"""
+        journal_path = (self.current_project / '.code_assistant' / 'changes.jsonl').resolve()
+        if self.journal is not None:
+            if self.journal.journal_path == journal_path:
+                return
+            self.close_journal()
+        try:
+            # Shared with every other handler on the same project in this process
+            self.journal = get_journal(
+                journal_path,
+                window_size=self.config.get('journal_window', 1000),
+                batch_size=self.config.get('journal_batch_size', 20),
+                flush_interval=self.config.get('journal_flush_interval', 30)
+            )
+        except Exception as e:
+            logger.warning(f"Change journal unavailable: {e}")
+
+    def flush_journal(self):
+        if self.journal is not None:
+            self.journal.flush_due()
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.flush()
+            self.journal = None
+
+    def trim_caches(self):
+        """Release in-memory caches that can be rebuilt from disk"""
+        self.project_files.evict()
+        if self.journal is not None:
+            self.journal.trim()
 
     def load_project(self, project_path):
         """Load a project and index its files"""
@@ -123,8 +211,9 @@ class ProjectFileHandler:
 
         try:
             self.current_project = Path(project_path)
-            self.project_files = {}
+            self.project_files = ProjectFiles()
             self.load_gitignore(project_path)
+            self.open_journal()
             
             self.project_metadata = {
                 'last_modified': time.time(),
@@ -155,7 +244,7 @@ class ProjectFileHandler:
                             self.project_files[str(file)] = content
                             
                             # Update metadata
-                            analysis = self.analyze_code(file)
+                            analysis = self.analyze_code(file, content)
                             if analysis:
                                 self.project_metadata['total_lines'] += analysis['lines']
                                 lang = analysis['language']